@@ -9,22 +9,36 @@ __version__ = "0.1.0"
 __author__ = "Biomedical Engineering Group"
 
 from .stationary import solve_stationary_diffusion
-from .quasistationary import solve_quasistationary_diffusion, animate_solution
+from .quasistationary import (solve_quasistationary_diffusion,
+                             solve_quasistationary_series, animate_solution)
 from .boundary_conditions import DirichletBC, NeumannBC, RobinBC
-from .geometry import create_rectangular_domain, create_deformed_domain
+from .geometry import (create_rectangular_domain, create_deformed_domain,
+                       create_tissue_mask)
 from .constants import PhysicalConstants
+from .checkpoint import Checkpoint
+from .ensemble import run_ensemble
+from .reduced_order import ReducedOrderModel
+from .inverse import flux_sensitivity, fit_screening_length, fit_screening_lengths
 from .visualization import plot_concentration_field, plot_oxygen_flux
 
 __all__ = [
     'solve_stationary_diffusion',
     'solve_quasistationary_diffusion',
+    'solve_quasistationary_series',
     'animate_solution',
     'DirichletBC',
     'NeumannBC',
     'RobinBC',
     'create_rectangular_domain',
     'create_deformed_domain',
+    'create_tissue_mask',
     'PhysicalConstants',
+    'Checkpoint',
+    'run_ensemble',
+    'ReducedOrderModel',
+    'flux_sensitivity',
+    'fit_screening_length',
+    'fit_screening_lengths',
     'plot_concentration_field',
     'plot_oxygen_flux',
 ]
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Ensemble runs over random realisations, e.g. COPD tissue masks.
+"""
+
+import numpy as np
+
+from .checkpoint import as_checkpoint
+
+
+def run_ensemble(sample, n_samples, seed=0, checkpoint=None, resume=False):
+    """
+    Run ``sample`` over independent random streams and reduce the results.
+
+    Sample ``i`` receives a generator seeded from ``(seed, i)``, so each
+    realisation is reproducible on its own and a resumed run draws exactly
+    the same numbers as an uninterrupted one. Results are reduced on the fly
+    (Welford's running mean and variance), so memory use does not grow with
+    the ensemble size.
+
+    Parameters
+    ----------
+    sample : callable
+        Function ``sample(rng)`` returning a float or ndarray, for instance
+        the oxygen flux or concentration field of one random COPD mask
+    n_samples : int
+        Number of realisations
+    seed : int
+        Base seed of the ensemble
+    checkpoint : Checkpoint or path, optional
+        Where and how often (in samples) to snapshot the partial reductions
+    resume : bool
+        Continue from the checkpoint if one exists
+
+    Returns
+    -------
+    mean : ndarray
+        Ensemble mean of the sample results
+    std : ndarray
+        Ensemble standard deviation (ddof=1; zero for a single sample)
+    """
+    if n_samples < 1:
+        raise ValueError("An ensemble needs at least one sample")
+
+    start = 0
+    mean = None
+    m2 = None
+
+    checkpoint = as_checkpoint(checkpoint)
+    state = checkpoint.load() if (checkpoint is not None and resume) else None
+    if checkpoint is not None and state is None:
+        # A fresh run must not leave a stale snapshot to resume from
+        checkpoint.clear()
+    if state is not None:
+        if int(state['seed']) != seed or int(state['n_samples']) != n_samples:
+            raise ValueError("Checkpoint was written for a different ensemble")
+        start = int(state['count'])
+        mean = state['mean']
+        m2 = state['m2']
+
+    for i in range(start, n_samples):
+        rng = np.random.default_rng([seed, i])
+        value = np.asarray(sample(rng), dtype=float)
+
+        if mean is None:
+            mean = np.zeros_like(value)
+            m2 = np.zeros_like(value)
+        count = i + 1
+        delta = value - mean
+        mean = mean + delta / count
+        m2 = m2 + delta * (value - mean)
+
+        if checkpoint is not None and checkpoint.due(i):
+            checkpoint.save(seed=seed, n_samples=n_samples, count=count,
+                            mean=mean, m2=m2)
+
+    std = np.sqrt(m2 / (n_samples - 1)) if n_samples > 1 else np.zeros_like(mean)
+    return mean, std
@@ -57,4 +57,28 @@ def create_deformed_domain(N, M, L_x, L_y, deformation_factor=0.3):
     # Mask for deformed region (simulating destroyed tissue)
     mask = ((X - center_x)**2 / rx**2 + (Y - center_y)**2 / ry**2) <= 1
     
-    return X, Y, mask
\ No newline at end of file
+    return X, Y, mask
+
+def create_tissue_mask(N, M, L, deformation_factor):
+    """
+    Tissue mask of a square domain with COPD deformation.
+    
+    Parameters
+    ----------
+    N, M : int
+        Grid dimensions
+    L : float
+        Domain size (m)
+    deformation_factor : float
+        Amount of deformation (0 = healthy tissue)
+    
+    Returns
+    -------
+    mask : ndarray or None
+        Boolean mask, True where tissue is present, as expected by the
+        solvers. None for healthy tissue
+    """
+    if deformation_factor == 0:
+        return None
+    _, _, destroyed = create_deformed_domain(N, M, L, L, deformation_factor)
+    return ~destroyed
@@ -4,15 +4,17 @@ Solves time-dependent diffusion with periodic boundary conditions.
 """
 
 import numpy as np
-from scipy.sparse import lil_matrix
-from scipy.sparse.linalg import spsolve
+from scipy.sparse.linalg import spsolve, splu, bicgstab, LinearOperator
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 
 from .constants import PhysicalConstants
+from .assembly import assemble_diffusion_operator, robin_term, dirichlet_rhs
+from .checkpoint import as_checkpoint, fingerprint
 
 def solve_quasistationary_diffusion(N, M, L, time, C_a=None, C_b=None, 
-                                  C_1=None, omega=None, lambda_param=None):
+                                  C_1=None, omega=None, lambda_param=None,
+                                  D=None, mask=None):
     """
     Solve quasi-stationary diffusion with time-dependent Dirichlet boundary.
     
@@ -28,8 +30,12 @@ def solve_quasistationary_diffusion(N, M, L, time, C_a=None, C_b=None,
         Concentration parameters (mol/m³)
     omega : float
         Breathing angular frequency (rad/s)
-    lambda_param : float
-        Screening length (m)
+    lambda_param : float or callable
+        Screening length (m), or a function of time returning it
+    D : ndarray, optional
+        Per-cell diffusivity of shape (M, N) (m²/s). Defaults to uniform
+    mask : ndarray, optional
+        Boolean array of shape (M, N), True where tissue is present
     
     Returns
     -------
@@ -47,57 +53,199 @@ def solve_quasistationary_diffusion(N, M, L, time, C_a=None, C_b=None,
         omega = PhysicalConstants.OMEGA_REST
     if lambda_param is None:
         lambda_param = PhysicalConstants.LAMBDA_TYPICAL
+    if callable(lambda_param):
+        lambda_param = lambda_param(time)
     
     dx = L / N
-    total_points = N * M
     
     # Time-dependent boundary condition
     C_top = C_a - C_b + C_1 * (np.cos(omega * time) - 1)
     
     # Build matrix (same structure as stationary case)
-    A = lil_matrix((total_points, total_points))
-    B = np.zeros(total_points)
-    
-    def index(i, j):
-        return j * N + i
-    
-    for i in range(N):
-        for j in range(M):
-            k = index(i, j)
-            
-            if 0 < i < N-1 and 0 < j < M-1:
-                A[k, index(i+1, j)] = 1
-                A[k, index(i-1, j)] = 1
-                A[k, index(i, j+1)] = 1
-                A[k, index(i, j-1)] = 1
-                A[k, k] = -4
-                B[k] = 0
-                
-            elif j == M-1:  # Top boundary (time-dependent Dirichlet)
-                A[k, k] = 1
-                B[k] = C_top
-                
-            elif j == 0:  # Bottom boundary (Robin)
-                A[k, k] = 1 + dx/lambda_param
-                A[k, index(i, 1)] = -1
-                B[k] = 0
-                
-            elif i == 0 and 0 < j < M-1:  # Left boundary (Neumann)
-                A[k, k] = 1
-                A[k, index(1, j)] = -1
-                B[k] = 0
-                
-            elif i == N-1 and 0 < j < M-1:  # Right boundary (Neumann)
-                A[k, k] = 1
-                A[k, index(N-2, j)] = -1
-                B[k] = 0
-    
-    A_csr = A.tocsr()
-    solution = spsolve(A_csr, B)
+    A0, robin_rows, top_rows = assemble_diffusion_operator(N, M, dx, D, mask)
+    A = A0 + robin_term(N, M, robin_rows, dx, lambda_param)
+    B = dirichlet_rhs(N, M, top_rows, C_top)
+    
+    solution = spsolve(A.tocsr(), B)
     concentration = solution.reshape((M, N)) + C_b
     
     return concentration, C_top
 
+def solve_quasistationary_series(N, M, L, times, C_a=None, C_b=None, C_1=None,
+                                 omega=None, lambda_param=None, top_bc=None,
+                                 D=None, mask=None, rtol=1e-10, maxiter=200,
+                                 refactor_after=8, checkpoint=None, resume=False):
+    """
+    Solve the quasi-stationary problem over a sequence of times.
+    
+    The screening length and the top boundary value may both depend on
+    time. The operator is assembled once; each step only updates the Robin
+    diagonal and is solved with BiCGSTAB, warm-started from the previous
+    step's field and preconditioned by the exact LU factors of an earlier
+    step's operator. Since λ only changes N diagonal entries, these factors
+    stay a near-exact inverse; they are recomputed at the current λ when a
+    step needs more than ``refactor_after`` preconditioner applications.
+    
+    Parameters
+    ----------
+    N, M : int
+        Grid dimensions
+    L : float
+        Domain length (m)
+    times : array-like
+        Increasing sequence of times (s)
+    C_a, C_b, C_1 : float
+        Concentration parameters (mol/m³)
+    omega : float
+        Breathing angular frequency (rad/s)
+    lambda_param : float or callable
+        Screening length (m), or a function of time returning it. A varying
+        effective exchange surface S(t) enters as λ(t) = λ / S(t).
+    top_bc : callable, optional
+        Function of time returning the top Dirichlet value relative to C_b
+        (mol/m³). Defaults to C_a - C_b + C_1 * (cos(omega * t) - 1)
+    D : ndarray, optional
+        Per-cell diffusivity of shape (M, N) (m²/s). Defaults to uniform
+    mask : ndarray, optional
+        Boolean array of shape (M, N), True where tissue is present
+    rtol : float
+        Relative residual tolerance of the iterative solver
+    maxiter : int
+        Maximum number of iterations per time step
+    refactor_after : int
+        Preconditioner applications per step above which the LU factors are
+        recomputed for the following steps
+    checkpoint : Checkpoint or path, optional
+        Where and how often to snapshot the run state. Solver state goes to
+        the snapshot, concentration frames to an incrementally written
+        ``<path>.frames.npy``
+    resume : bool
+        Continue from the checkpoint if one exists. The resumed run is
+        bit-identical to an uninterrupted one; a snapshot written for a
+        different grid, diffusivity, mask, time grid, screening length or
+        boundary values is rejected with a ValueError
+    
+    Returns
+    -------
+    concentrations : ndarray
+        Array of shape (len(times), M, N) with the concentration fields
+    C_tops : ndarray
+        Top boundary values at each time
+    iterations : ndarray
+        Number of preconditioner applications (LU solves) spent on each
+        time step
+    """
+    if C_a is None:
+        C_a = PhysicalConstants.C_AIR
+    if C_b is None:
+        C_b = PhysicalConstants.C_BLOOD
+    if C_1 is None:
+        C_1 = PhysicalConstants.C_REST
+    if omega is None:
+        omega = PhysicalConstants.OMEGA_REST
+    if lambda_param is None:
+        lambda_param = PhysicalConstants.LAMBDA_TYPICAL
+    if top_bc is None:
+        top_bc = lambda t: C_a - C_b + C_1 * (np.cos(omega * t) - 1)
+    
+    lambda_of_t = lambda_param if callable(lambda_param) else (lambda t: lambda_param)
+    times = np.atleast_1d(np.asarray(times, dtype=float))
+    
+    dx = L / N
+    A0, robin_rows, top_rows = assemble_diffusion_operator(N, M, dx, D, mask)
+    
+    concentrations = np.empty((len(times), M, N))
+    C_tops = np.empty(len(times))
+    lambdas = np.empty(len(times))
+    iterations = np.zeros(len(times), dtype=int)
+    if len(times) == 0:
+        return concentrations, C_tops, iterations
+    
+    applications = [0]
+    
+    def factorize(lam):
+        lu = splu((A0 + robin_term(N, M, robin_rows, dx, lam)).tocsc())
+        
+        def apply(x):
+            applications[0] += 1
+            return lu.solve(x)
+        
+        return LinearOperator(A0.shape, apply)
+    
+    solution = None
+    start = 0
+    lambda_factored = lambda_of_t(times[0])
+    checkpoint = as_checkpoint(checkpoint)
+    state = checkpoint.load() if (checkpoint is not None and resume) else None
+    problem = fingerprint(D, mask)
+    if state is not None:
+        if (int(state['N']), int(state['M']), float(state['L'])) != (N, M, L):
+            raise ValueError("Checkpoint was written for a different grid "
+                             f"(N={int(state['N'])}, M={int(state['M'])}, "
+                             f"L={float(state['L'])})")
+        if str(state['problem']) != problem:
+            raise ValueError("Checkpoint was written for a different diffusivity or mask")
+        if not np.array_equal(state['times'], times):
+            raise ValueError("Checkpoint was written for a different time grid")
+        start = int(state['step'])
+        resumed_lambdas = [lambda_of_t(t) for t in times[:start]]
+        resumed_tops = [top_bc(t) for t in times[:start]]
+        if (not np.array_equal(state['lambdas'][:start], resumed_lambdas)
+                or not np.array_equal(state['C_tops'][:start], resumed_tops)
+                or float(state['C_b']) != C_b):
+            raise ValueError("Checkpoint was written for a different screening "
+                             "length or boundary values")
+        solution = state['solution']
+        lambda_factored = float(state['lambda_factored'])
+        C_tops[:start] = state['C_tops'][:start]
+        lambdas[:start] = state['lambdas'][:start]
+        iterations[:start] = state['iterations'][:start]
+    
+    if checkpoint is not None:
+        if state is None:
+            # A fresh run must not leave a stale snapshot to resume from
+            checkpoint.clear()
+        frames = checkpoint.frames(concentrations.shape, resume=state is not None)
+        concentrations[:start] = frames[:start]
+        saved = start
+    
+    preconditioner = factorize(lambda_factored)
+    
+    for n in range(start, len(times)):
+        t = times[n]
+        lambdas[n] = lambda_of_t(t)
+        A = (A0 + robin_term(N, M, robin_rows, dx, lambdas[n])).tocsr()
+        C_tops[n] = top_bc(t)
+        B = dirichlet_rhs(N, M, top_rows, C_tops[n])
+        
+        applications[0] = 0
+        if solution is None:
+            solution = preconditioner.matvec(B)
+        
+        solution, info = bicgstab(A, B, x0=solution, rtol=rtol,
+                                  maxiter=maxiter, M=preconditioner)
+        if info != 0:
+            raise RuntimeError(f"BiCGSTAB did not converge at t={t} (info={info})")
+        iterations[n] = applications[0]
+        
+        if iterations[n] > refactor_after:
+            lambda_factored = lambdas[n]
+            preconditioner = factorize(lambda_factored)
+        
+        concentrations[n] = solution.reshape((M, N)) + C_b
+        
+        if checkpoint is not None and checkpoint.due(n):
+            # Frames first, so the snapshot never points past persisted output
+            frames[saved:n + 1] = concentrations[saved:n + 1]
+            checkpoint.flush(frames)
+            saved = n + 1
+            checkpoint.save(step=n + 1, time=t, times=times, N=N, M=M, L=L,
+                            C_b=C_b, problem=problem, solution=solution,
+                            lambda_factored=lambda_factored, lambdas=lambdas,
+                            C_tops=C_tops, iterations=iterations)
+    
+    return concentrations, C_tops, iterations
+
 def animate_solution(N=50, M=50, L=0.01, duration=10, fps=10):
     """
     Create animation of quasi-stationary solution.
@@ -0,0 +1,247 @@
+"""
+Reduced-order (POD) surrogate of the diffusion solvers for fast parameter queries.
+
+The field is linear in the top Dirichlet value, so C_a, C_b, C_1, omega and
+time only scale a unit solution. The surrogate therefore learns the unit
+field as a function of the screening length λ and the COPD deformation
+factor, using a POD basis and a Galerkin projection of A(λ) = A0 + (dx/λ) R.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from .constants import PhysicalConstants
+from .geometry import create_tissue_mask
+from .assembly import assemble_diffusion_operator, robin_term, dirichlet_rhs
+from .stationary import solve_stationary_diffusion, calculate_oxygen_flux
+from .quasistationary import solve_quasistationary_diffusion
+
+
+def randomized_svd(S, rank, n_oversamples=10, n_iter=2, seed=0):
+    """
+    Truncated SVD by randomized range finding (Halko, Martinsson & Tropp).
+
+    Parameters
+    ----------
+    S : ndarray
+        Matrix to decompose, shape (n, m)
+    rank : int
+        Number of singular triplets to return
+    n_oversamples : int
+        Extra random directions sampled beyond ``rank``
+    n_iter : int
+        Number of power iterations
+    seed : int
+        Seed of the random test matrix
+
+    Returns
+    -------
+    U : ndarray
+        Left singular vectors, shape (n, rank)
+    s : ndarray
+        Singular values in decreasing order
+    Vt : ndarray
+        Right singular vectors, shape (rank, m)
+    """
+    rng = np.random.default_rng(seed)
+    n_random = min(rank + n_oversamples, min(S.shape))
+    Q, _ = np.linalg.qr(S @ rng.standard_normal((S.shape[1], n_random)))
+    for _ in range(n_iter):
+        Q, _ = np.linalg.qr(S.T @ Q)
+        Q, _ = np.linalg.qr(S @ Q)
+    U_small, s, Vt = np.linalg.svd(Q.T @ S, full_matrices=False)
+    return (Q @ U_small)[:, :rank], s[:rank], Vt[:rank]
+
+
+class ReducedOrderModel:
+    """
+    POD-Galerkin surrogate of the stationary and quasi-stationary solvers.
+
+    Snapshots of the unit-Dirichlet field are collected with
+    ``solve_stationary_diffusion`` over the training screening lengths and
+    deformation factors, then compressed into a POD basis. Each query solves
+    a reduced system of size ``rank`` and evaluates the relative residual of
+    the full system from precomputed reduced quantities. When that estimate
+    exceeds ``tol`` the full solver is called instead.
+
+    The deformation factor changes the tissue mask, which is not an affine
+    parameter, so reduced operators exist only for the trained geometries.
+    A query is answered by the surrogate only when its tissue mask is
+    identical to a trained one; other queries are sent to the full solver.
+
+    Parameters
+    ----------
+    N, M : int
+        Grid dimensions
+    L : float
+        Domain length (m)
+    lambda_values : array-like
+        Training screening lengths (m)
+    deformation_factors : array-like
+        Training COPD deformation factors (0 = healthy)
+    rank : int
+        Size of the POD basis
+    tol : float
+        Residual tolerance above which queries fall back to the full solver
+    seed : int
+        Seed of the randomized SVD
+    """
+
+    def __init__(self, N, M, L, lambda_values, deformation_factors=(0.0,),
+                 rank=20, tol=1e-3, seed=0):
+        self.N, self.M, self.L = N, M, L
+        self.dx = L / N
+        self.tol = tol
+        self.deformation_factors = np.unique(np.asarray(deformation_factors, dtype=float))
+        self.fallbacks = 0
+
+        snapshots = [
+            solve_stationary_diffusion(N, M, L, C_a=1.0, C_b=0.0, lambda_param=lam,
+                                       mask=create_tissue_mask(N, M, L, factor)).ravel()
+            for factor in deformation_factors
+            for lam in lambda_values
+        ]
+        S = np.column_stack(snapshots)
+        rank = min(rank, S.shape[1])
+        self.basis, self.singular_values, _ = randomized_svd(S, rank, seed=seed)
+
+        self._masks = [self._tissue_mask(factor) for factor in self.deformation_factors]
+        self._reduced = [self._reduced_system(mask) for mask in self._masks]
+        self._geometry = lru_cache(maxsize=256)(self._match_geometry)
+
+    def _tissue_mask(self, deformation_factor):
+        """Tissue mask of a deformation factor, all True when healthy."""
+        mask = create_tissue_mask(self.N, self.M, self.L, deformation_factor)
+        return np.ones((self.M, self.N), dtype=bool) if mask is None else mask
+
+    def _match_geometry(self, deformation_factor):
+        """Index of the trained geometry with the query's exact mask, or None."""
+        mask = self._tissue_mask(deformation_factor)
+        for index, trained in enumerate(self._masks):
+            if np.array_equal(mask, trained):
+                return index
+        return None
+
+    def _reduced_system(self, mask):
+        """Projected operators and residual Gram matrices for one geometry."""
+        N, M, V = self.N, self.M, self.basis
+        A0, robin_rows, top_rows = assemble_diffusion_operator(N, M, self.dx, mask=mask)
+        b = dirichlet_rhs(N, M, top_rows, 1.0)
+        A0V = A0 @ V
+        RV = robin_term(N, M, robin_rows, 1.0, 1.0) @ V
+        return {
+            'A0': V.T @ A0V,
+            'AR': V.T @ RV,
+            'b': V.T @ b,
+            'G00': A0V.T @ A0V,
+            'G0R': A0V.T @ RV + RV.T @ A0V,
+            'GRR': RV.T @ RV,
+            'h0': A0V.T @ b,
+            'hR': RV.T @ b,
+            'bb': b @ b,
+            'bottom': V[:N].sum(axis=0),
+        }
+
+    def _solve_reduced(self, lambda_param, deformation_factor):
+        """
+        Reduced coefficients, relative residual of the unit problem and the
+        reduced system used. Returns (None, inf, None) when the query's
+        geometry was not trained.
+        """
+        index = self._geometry(float(deformation_factor))
+        if index is None:
+            return None, np.inf, None
+        r = self._reduced[index]
+        theta = self.dx / lambda_param
+        a = np.linalg.solve(r['A0'] + theta * r['AR'], r['b'])
+        residual2 = (r['bb'] - 2 * a @ (r['h0'] + theta * r['hR'])
+                     + a @ (r['G00'] + theta * r['G0R'] + theta**2 * r['GRR']) @ a)
+        estimate = np.sqrt(max(residual2, 0.0) / r['bb'])
+        return a, estimate, r
+
+    def _parameters(self, lambda_param, C_a, C_b, C_1, omega, time):
+        """Fill defaults and return (lambda_param, C_a, C_b, top boundary value)."""
+        if C_a is None:
+            C_a = PhysicalConstants.C_AIR
+        if C_b is None:
+            C_b = PhysicalConstants.C_BLOOD
+        if C_1 is None:
+            C_1 = PhysicalConstants.C_REST
+        if omega is None:
+            omega = PhysicalConstants.OMEGA_REST
+        if lambda_param is None:
+            lambda_param = PhysicalConstants.LAMBDA_TYPICAL
+        C_top = C_a - C_b
+        if time is not None:
+            C_top += C_1 * (np.cos(omega * time) - 1)
+        return lambda_param, C_a, C_b, C_top
+
+    def _full_solve(self, lambda_param, C_a, C_b, C_1, omega, time, deformation_factor):
+        """Concentration field from the full solver."""
+        self.fallbacks += 1
+        mask = create_tissue_mask(self.N, self.M, self.L, deformation_factor)
+        if time is None:
+            return solve_stationary_diffusion(self.N, self.M, self.L, C_a, C_b,
+                                              lambda_param, mask=mask)
+        C, _ = solve_quasistationary_diffusion(self.N, self.M, self.L, time, C_a, C_b,
+                                               C_1, omega, lambda_param, mask=mask)
+        return C
+
+    def solve(self, lambda_param=None, C_a=None, C_b=None, C_1=None, omega=None,
+              time=None, deformation_factor=0.0):
+        """
+        Concentration field at a parameter point.
+
+        Parameters
+        ----------
+        lambda_param : float
+            Screening length (m)
+        C_a, C_b, C_1 : float
+            Concentration parameters (mol/m³)
+        omega : float
+            Breathing angular frequency (rad/s)
+        time : float, optional
+            Time (s) of the quasi-stationary regime. None for stationary
+        deformation_factor : float
+            COPD deformation factor. Answered by the surrogate only if its
+            tissue mask matches a trained factor's exactly
+
+        Returns
+        -------
+        concentration : ndarray
+            2D concentration field (mol/m³)
+        estimate : float
+            Relative residual of the reduced solution, inf if the geometry
+            was not trained. Above ``tol`` the returned field comes from the full
+            solver
+        """
+        lam, C_a_, C_b_, C_top = self._parameters(lambda_param, C_a, C_b, C_1,
+                                                  omega, time)
+        a, estimate, _ = self._solve_reduced(lam, deformation_factor)
+        if estimate > self.tol:
+            C = self._full_solve(lam, C_a_, C_b_, C_1, omega, time, deformation_factor)
+            return C, estimate
+        return (self.basis @ a).reshape((self.M, self.N)) * C_top + C_b_, estimate
+
+    def flux(self, lambda_param=None, C_a=None, C_b=None, C_1=None, omega=None,
+             time=None, deformation_factor=0.0):
+        """
+        Oxygen flux through the Robin boundary, as in ``calculate_oxygen_flux``.
+
+        Parameters are those of ``solve``.
+
+        Returns
+        -------
+        flux : float
+            Total oxygen flux (mol/s per unit depth)
+        estimate : float
+            Relative residual of the reduced solution, as in ``solve``
+        """
+        lam, C_a_, C_b_, C_top = self._parameters(lambda_param, C_a, C_b, C_1,
+                                                  omega, time)
+        a, estimate, r = self._solve_reduced(lam, deformation_factor)
+        if estimate > self.tol:
+            C = self._full_solve(lam, C_a_, C_b_, C_1, omega, time, deformation_factor)
+            return calculate_oxygen_flux(C, self.dx, lam), estimate
+        return (self.N * C_b_ + C_top * (r['bottom'] @ a)) * self.dx / lam, estimate
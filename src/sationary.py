@@ -1,17 +1,18 @@
 """
 Stationary regime oxygen diffusion solver.
-Solves ΔC = 0 with mixed boundary conditions.
+Solves ∇·(D∇C) = 0 with mixed boundary conditions.
 """
 
 import numpy as np
-from scipy.sparse import lil_matrix, csr_matrix
 from scipy.sparse.linalg import spsolve
 
 from .constants import PhysicalConstants
+from .assembly import assemble_diffusion_operator, robin_term, dirichlet_rhs
 
-def solve_stationary_diffusion(N, M, L, C_a=None, C_b=None, lambda_param=None):
+def solve_stationary_diffusion(N, M, L, C_a=None, C_b=None, lambda_param=None,
+                               D=None, mask=None):
     """
-    Solve stationary diffusion equation ΔC = 0 with mixed boundary conditions.
+    Solve stationary diffusion equation ∇·(D∇C) = 0 with mixed boundary conditions.
     
     Parameters
     ----------
@@ -25,6 +26,12 @@ def solve_stationary_diffusion(N, M, L, C_a=None, C_b=None, lambda_param=None):
         Blood oxygen concentration (mol/m³). Defaults to PhysicalConstants.C_BLOOD
     lambda_param : float, optional
         Screening length parameter (m). Defaults to PhysicalConstants.LAMBDA_TYPICAL
+    D : ndarray, optional
+        Per-cell diffusivity of shape (M, N) (m²/s), e.g. PhysicalConstants.D_O2
+        divided by a local tortuosity map. Defaults to uniform (ΔC = 0)
+    mask : ndarray, optional
+        Boolean array of shape (M, N), True where tissue is present. Cells
+        outside the mask are held at the blood concentration C_b
     
     Returns
     -------
@@ -40,68 +47,16 @@ def solve_stationary_diffusion(N, M, L, C_a=None, C_b=None, lambda_param=None):
         lambda_param = PhysicalConstants.LAMBDA_TYPICAL
     
     dx = L / N
-    total_points = N * M
     
-    # Initialize sparse matrix and RHS vector
-    A = lil_matrix((total_points, total_points))
-    B = np.zeros(total_points)
+    # Assemble the linear system
+    A0, robin_rows, top_rows = assemble_diffusion_operator(N, M, dx, D, mask)
+    A = A0 + robin_term(N, M, robin_rows, dx, lambda_param)
     
-    def index(i, j):
-        """Convert 2D grid indices to 1D array index."""
-        return j * N + i
-    
-    # Build the linear system
-    for i in range(N):
-        for j in range(M):
-            k = index(i, j)
-            
-            # Interior points: Laplace equation discretization
-            if 0 < i < N-1 and 0 < j < M-1:
-                A[k, index(i+1, j)] = 1
-                A[k, index(i-1, j)] = 1  
-                A[k, index(i, j+1)] = 1
-                A[k, index(i, j-1)] = 1
-                A[k, k] = -4
-                B[k] = 0
-                
-            # Top boundary (Dirichlet): C = C_a - C_b
-            elif j == M-1:
-                A[k, k] = 1
-                B[k] = C_a - C_b
-                
-            # Bottom boundary (Robin): ∂C/∂n = -C/λ
-            elif j == 0:
-                A[k, k] = 1 + dx/lambda_param
-                A[k, index(i, 1)] = -1
-                B[k] = 0
-                
-            # Left boundary (Neumann): ∂C/∂n = 0
-            elif i == 0 and 0 < j < M-1:
-                A[k, k] = 1
-                A[k, index(1, j)] = -1
-                B[k] = 0
-                
-            # Right boundary (Neumann): ∂C/∂n = 0  
-            elif i == N-1 and 0 < j < M-1:
-                A[k, k] = 1
-                A[k, index(N-2, j)] = -1
-                B[k] = 0
-                
-            # Corner points - average of adjacent boundary conditions
-            elif i == 0 and j == 0:  # Bottom-left corner
-                A[k, k] = 2 + dx/lambda_param
-                A[k, index(1, 0)] = -1
-                A[k, index(0, 1)] = -1
-                B[k] = 0
-            elif i == N-1 and j == 0:  # Bottom-right corner
-                A[k, k] = 2 + dx/lambda_param
-                A[k, index(N-2, 0)] = -1
-                A[k, index(N-1, 1)] = -1
-                B[k] = 0
+    # Top boundary (Dirichlet): C = C_a - C_b
+    B = dirichlet_rhs(N, M, top_rows, C_a - C_b)
     
     # Solve the linear system
-    A_csr = A.tocsr()
-    solution = spsolve(A_csr, B)
+    solution = spsolve(A.tocsr(), B)
     
     # Reshape and add blood concentration baseline
     concentration = solution.reshape((M, N)) + C_b
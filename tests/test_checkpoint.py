@@ -0,0 +1,154 @@
+"""
+Tests for checkpoint/restart of time series and ensembles.
+"""
+
+import os
+
+import numpy as np
+import pytest
+from src.acinus_diffusion.checkpoint import Checkpoint
+from src.acinus_diffusion.ensemble import run_ensemble
+from src.acinus_diffusion.quasistationary import solve_quasistationary_series
+from src.acinus_diffusion.stationary import (solve_stationary_diffusion,
+                                             calculate_oxygen_flux)
+
+class Preempted(Exception):
+    pass
+
+def test_atomic_save_and_load(tmp_path):
+    """Test snapshot round trip and absence of temporary files."""
+    checkpoint = Checkpoint(tmp_path / "state.npz", every=2)
+    assert checkpoint.load() is None
+    
+    checkpoint.save(step=3, field=np.arange(6.0).reshape(2, 3))
+    state = checkpoint.load()
+    
+    assert int(state['step']) == 3
+    np.testing.assert_array_equal(state['field'], np.arange(6.0).reshape(2, 3))
+    assert os.listdir(tmp_path) == ["state.npz"]
+    assert checkpoint.writes == 1 and checkpoint.seconds > 0
+
+def test_series_resume_bit_identical(tmp_path):
+    """Test that a preempted time series resumes to the same result."""
+    N, M = 20, 20
+    L = 0.01
+    times = np.linspace(0, 4, 11)
+    lambda_of_t = lambda t: 0.28 * (1 + 0.3 * np.sin(t))
+    reference = solve_quasistationary_series(N, M, L, times,
+                                             lambda_param=lambda_of_t)
+    
+    def failing_bc(t):
+        if t > 2.5:
+            raise Preempted
+        return 8.4 - 5.1e-4 + 4.2 * (np.cos(2 * np.pi * 0.3 * t) - 1)
+    
+    path = tmp_path / "series.npz"
+    with pytest.raises(Preempted):
+        solve_quasistationary_series(N, M, L, times, lambda_param=lambda_of_t,
+                                     top_bc=failing_bc,
+                                     checkpoint=Checkpoint(path, every=3))
+    assert int(Checkpoint(path).load()['step']) == 6
+    
+    resumed = solve_quasistationary_series(N, M, L, times,
+                                           lambda_param=lambda_of_t,
+                                           checkpoint=path, resume=True)
+    for expected, actual in zip(reference, resumed):
+        np.testing.assert_array_equal(actual, expected)
+
+def test_ensemble_resume_bit_identical(tmp_path):
+    """Test that a preempted ensemble resumes to the same reductions."""
+    N, M = 15, 15
+    L = 0.01
+    calls = []
+    
+    def copd_flux(rng, fail_at=None):
+        if len(calls) == fail_at:
+            raise Preempted
+        calls.append(1)
+        mask = rng.random((M, N)) > 0.1
+        mask[-1, :] = True
+        C = solve_stationary_diffusion(N, M, L, mask=mask)
+        return calculate_oxygen_flux(C, L / N, 0.28)
+    
+    reference = run_ensemble(copd_flux, 8, seed=42)
+    
+    calls.clear()
+    path = tmp_path / "ensemble.npz"
+    with pytest.raises(Preempted):
+        run_ensemble(lambda rng: copd_flux(rng, fail_at=5), 8, seed=42,
+                     checkpoint=Checkpoint(path, every=2))
+    
+    calls.clear()
+    resumed = run_ensemble(copd_flux, 8, seed=42, checkpoint=path, resume=True)
+    
+    assert len(calls) == 4
+    np.testing.assert_array_equal(resumed[0], reference[0])
+    np.testing.assert_array_equal(resumed[1], reference[1])
+    assert reference[1] > 0
+
+def test_series_resume_rejects_other_problem(tmp_path):
+    """Test that snapshots of a different problem are not spliced in."""
+    N, M = 15, 15
+    L = 0.01
+    times = np.linspace(0, 2, 6)
+    path = tmp_path / "series.npz"
+    solve_quasistationary_series(N, M, L, times, checkpoint=Checkpoint(path, every=2))
+    
+    with pytest.raises(ValueError, match="grid"):
+        solve_quasistationary_series(N + 1, M, L, times, checkpoint=path, resume=True)
+    with pytest.raises(ValueError, match="screening length"):
+        solve_quasistationary_series(N, M, L, times, lambda_param=0.1,
+                                     checkpoint=path, resume=True)
+    with pytest.raises(ValueError, match="screening length"):
+        solve_quasistationary_series(N, M, L, times, top_bc=lambda t: 1.0,
+                                     checkpoint=path, resume=True)
+    mask = np.ones((M, N), dtype=bool)
+    mask[5:8, 5:8] = False
+    with pytest.raises(ValueError, match="mask"):
+        solve_quasistationary_series(N, M, L, times, mask=mask,
+                                     checkpoint=path, resume=True)
+
+def test_series_empty_times(tmp_path):
+    """Test that an empty time grid returns empty results."""
+    C, C_tops, iterations = solve_quasistationary_series(
+        10, 10, 0.01, [], checkpoint=tmp_path / "series.npz")
+    assert C.shape == (0, 10, 10)
+    assert C_tops.shape == iterations.shape == (0,)
+
+def test_series_resume_requires_frames(tmp_path):
+    """Test that a snapshot without its frames is rejected, not zero-filled."""
+    N, M = 15, 15
+    L = 0.01
+    times = np.linspace(0, 2, 6)
+    path = tmp_path / "series.npz"
+    solve_quasistationary_series(N, M, L, times, checkpoint=Checkpoint(path, every=2))
+    
+    os.unlink(str(path) + ".frames.npy")
+    with pytest.raises(ValueError, match="missing"):
+        solve_quasistationary_series(N, M, L, times, checkpoint=path, resume=True)
+
+def test_fresh_run_discards_stale_snapshot(tmp_path):
+    """Test that a fresh run preempted before its first save starts over."""
+    N, M = 15, 15
+    L = 0.01
+    times = np.linspace(0, 2, 6)
+    reference = solve_quasistationary_series(N, M, L, times)
+    path = tmp_path / "series.npz"
+    solve_quasistationary_series(N, M, L, times, checkpoint=Checkpoint(path, every=2))
+    
+    def failing_bc(t):
+        raise Preempted
+    
+    with pytest.raises(Preempted):
+        solve_quasistationary_series(N, M, L, times, top_bc=failing_bc,
+                                     checkpoint=Checkpoint(path, every=2))
+    assert Checkpoint(path).load() is None
+    
+    resumed = solve_quasistationary_series(N, M, L, times, checkpoint=path,
+                                           resume=True)
+    np.testing.assert_array_equal(resumed[0], reference[0])
+
+def test_ensemble_requires_samples():
+    """Test that an empty ensemble is rejected."""
+    with pytest.raises(ValueError):
+        run_ensemble(lambda rng: rng.random(), 0)
@@ -0,0 +1,93 @@
+"""
+Tests for inverse estimation of the screening length.
+"""
+
+import numpy as np
+import pytest
+from src.acinus_diffusion.inverse import (flux_sensitivity, fit_screening_length,
+                                          fit_screening_lengths)
+from src.acinus_diffusion.geometry import create_tissue_mask
+from src.acinus_diffusion.stationary import (solve_stationary_diffusion,
+                                             calculate_oxygen_flux)
+
+def test_flux_matches_forward_solver():
+    """Test that the flux agrees with calculate_oxygen_flux."""
+    N, M = 30, 30
+    L = 0.01
+    lambda_param = 0.1
+    C = solve_stationary_diffusion(N, M, L, lambda_param=lambda_param)
+    flux, _ = flux_sensitivity(N, M, L, lambda_param)
+    np.testing.assert_allclose(flux, calculate_oxygen_flux(C, L / N, lambda_param),
+                               rtol=1e-10)
+
+def test_adjoint_sensitivity_matches_finite_difference():
+    """Test the adjoint derivative against central differences."""
+    N, M = 25, 25
+    L = 0.01
+    mask = create_tissue_mask(N, M, L, 0.3)
+    lambda_param, h = 0.05, 1e-6
+    
+    _, dflux = flux_sensitivity(N, M, L, lambda_param, mask=mask)
+    flux_plus, _ = flux_sensitivity(N, M, L, lambda_param + h, mask=mask)
+    flux_minus, _ = flux_sensitivity(N, M, L, lambda_param - h, mask=mask)
+    
+    np.testing.assert_allclose(dflux, (flux_plus - flux_minus) / (2 * h), rtol=1e-6)
+
+def test_fit_recovers_screening_length():
+    """Test that a synthetic measurement is inverted in a few solves."""
+    N, M = 30, 30
+    L = 0.01
+    true_lambda = 0.05
+    measured, _ = flux_sensitivity(N, M, L, true_lambda,
+                                   mask=create_tissue_mask(N, M, L, 0.3))
+    
+    lambda_fit, flux_fit, iterations, converged = fit_screening_length(
+        measured, N, M, L, deformation_factor=0.3)
+    
+    assert converged
+    np.testing.assert_allclose(lambda_fit, true_lambda, rtol=1e-6)
+    np.testing.assert_allclose(flux_fit, measured, rtol=1e-8)
+    assert iterations <= 8
+
+def test_batch_fit():
+    """Test fitting several records, sequentially and in parallel."""
+    N, M = 20, 20
+    L = 0.01
+    true_lambdas = np.array([0.02, 0.28, 1.5])
+    factors = np.array([0.0, 0.2, 0.3])
+    measured = [flux_sensitivity(N, M, L, lam,
+                                 mask=create_tissue_mask(N, M, L, factor))[0]
+                for lam, factor in zip(true_lambdas, factors)]
+    
+    sequential = fit_screening_lengths(measured, N, M, L, factors, max_workers=1)
+    parallel = fit_screening_lengths(measured, N, M, L, factors, max_workers=2)
+    
+    np.testing.assert_allclose(sequential[0], true_lambdas, rtol=1e-6)
+    assert np.all(sequential[3])
+    np.testing.assert_array_equal(parallel[0], sequential[0])
+
+def test_fit_reports_unreachable_measurement():
+    """Test that a flux outside the reachable range is flagged."""
+    N, M = 20, 20
+    L = 0.01
+    
+    lambda_fit, _, _, converged = fit_screening_length(-1.0, N, M, L)
+    assert not converged
+    assert lambda_fit == pytest.approx(2.0)
+    
+    _, _, _, converged = fit_screening_length(1.0, N, M, L, max_iter=1)
+    assert not converged
+    
+    with pytest.raises(ValueError):
+        fit_screening_length(1.0, N, M, L, max_iter=0)
+
+def test_batch_fit_validates_records():
+    """Test mismatched and empty batches."""
+    N, M = 15, 15
+    L = 0.01
+    
+    with pytest.raises(ValueError, match="deformation factors"):
+        fit_screening_lengths([0.1, 0.2, 0.3], N, M, L, [0.0], max_workers=1)
+    
+    results = fit_screening_lengths([], N, M, L, max_workers=1)
+    assert all(result.shape == (0,) for result in results)
@@ -4,7 +4,9 @@ Tests for quasi-stationary diffusion solver.
 
 import numpy as np
 import pytest
-from src.acinus_diffusion.quasistationary import solve_quasistationary_diffusion
+from src.acinus_diffusion.quasistationary import (solve_quasistationary_diffusion,
+                                                 solve_quasistationary_series)
+from src.acinus_diffusion.constants import PhysicalConstants
 
 def test_quasistationary_time_dependence():
     """Test that solution changes with time."""
@@ -59,4 +61,38 @@ def test_boundary_amplitude():
     expected_min = C_a - C_b + C_1 * (-1 - 1)  # = C_a - C_b - 2*C_1
     
     np.testing.assert_allclose(C_top_max, expected_max, rtol=1e-10)
-    np.testing.assert_allclose(C_top_min, expected_min, rtol=1e-10)
\ No newline at end of file
+    np.testing.assert_allclose(C_top_min, expected_min, rtol=1e-10)
+
+def test_series_matches_direct_solves():
+    """Test that the warm-started series agrees with per-step direct solves."""
+    N, M = 30, 30
+    L = 0.01
+    times = np.linspace(0, 3, 7)
+    lambda_of_t = lambda t: 0.28 * (1 + 0.5 * np.sin(t))
+    
+    C_series, C_tops, _ = solve_quasistationary_series(
+        N, M, L, times, lambda_param=lambda_of_t)
+    
+    for n, t in enumerate(times):
+        C, C_top = solve_quasistationary_diffusion(
+            N, M, L, t, lambda_param=lambda_of_t)
+        np.testing.assert_allclose(C_series[n], C, rtol=1e-6, atol=1e-8)
+        np.testing.assert_allclose(C_tops[n], C_top, rtol=1e-12)
+
+def test_series_custom_boundary():
+    """Test a user-supplied top boundary callable."""
+    N, M = 20, 20
+    L = 0.01
+    times = [0.0, 0.5, 1.0]
+    top_bc = lambda t: 8.0 - t
+    
+    C_series, C_tops, iterations = solve_quasistationary_series(
+        N, M, L, times, top_bc=top_bc)
+    
+    np.testing.assert_allclose(C_tops, [8.0, 7.5, 7.0])
+    expected_top = np.repeat(C_tops[:, None], N, axis=1)
+    np.testing.assert_allclose(C_series[:, -1, :] - PhysicalConstants.C_BLOOD,
+                               expected_top, rtol=1e-8)
+    # Reused LU factors keep the per-step solver work small
+    assert np.all(iterations >= 1)
+    assert np.all(iterations <= 4)
@@ -0,0 +1,85 @@
+"""
+Tests for the POD reduced-order surrogate.
+"""
+
+import numpy as np
+import pytest
+from src.acinus_diffusion.reduced_order import ReducedOrderModel, randomized_svd
+from src.acinus_diffusion.stationary import (solve_stationary_diffusion,
+                                             calculate_oxygen_flux)
+from src.acinus_diffusion.quasistationary import solve_quasistationary_diffusion
+from src.acinus_diffusion.geometry import create_tissue_mask
+
+def test_randomized_svd_matches_svd():
+    """Test randomized SVD on an exactly low-rank matrix."""
+    rng = np.random.default_rng(0)
+    S = rng.standard_normal((200, 5)) @ rng.standard_normal((5, 40))
+    U, s, Vt = randomized_svd(S, 5)
+    
+    np.testing.assert_allclose(s, np.linalg.svd(S, compute_uv=False)[:5], rtol=1e-10)
+    np.testing.assert_allclose(U @ np.diag(s) @ Vt, S, atol=1e-10)
+
+def test_surrogate_matches_full_solver():
+    """Test reduced solutions between training screening lengths."""
+    N, M = 30, 30
+    L = 0.01
+    rom = ReducedOrderModel(N, M, L, np.geomspace(0.01, 2.0, 10))
+    
+    for lambda_param in [0.02, 0.28, 1.3]:
+        C_rom, estimate = rom.solve(lambda_param)
+        C = solve_stationary_diffusion(N, M, L, lambda_param=lambda_param)
+        
+        assert estimate < rom.tol
+        np.testing.assert_allclose(C_rom, C, rtol=1e-6, atol=1e-8)
+        
+        flux_rom, _ = rom.flux(lambda_param)
+        np.testing.assert_allclose(flux_rom,
+                                   calculate_oxygen_flux(C, L / N, lambda_param),
+                                   rtol=1e-6)
+    assert rom.fallbacks == 0
+
+def test_surrogate_quasistationary_scaling():
+    """Test that breathing parameters are handled by the unit solution."""
+    N, M = 25, 25
+    L = 0.01
+    rom = ReducedOrderModel(N, M, L, np.geomspace(0.01, 2.0, 8))
+    
+    C_rom, _ = rom.solve(0.1, C_1=3.0, omega=2.0, time=1.3)
+    C, _ = solve_quasistationary_diffusion(N, M, L, 1.3, C_1=3.0, omega=2.0,
+                                           lambda_param=0.1)
+    np.testing.assert_allclose(C_rom, C, rtol=1e-6, atol=1e-8)
+
+def test_fallback_on_untrained_geometry():
+    """Test that deformation factors far from training use the full solver."""
+    N, M = 30, 30
+    L = 0.01
+    rom = ReducedOrderModel(N, M, L, np.geomspace(0.01, 2.0, 6))
+    
+    C_rom, estimate = rom.solve(0.28, deformation_factor=0.4)
+    C = solve_stationary_diffusion(N, M, L, lambda_param=0.28,
+                                   mask=create_tissue_mask(N, M, L, 0.4))
+    
+    assert estimate > rom.tol
+    assert rom.fallbacks == 1
+    np.testing.assert_allclose(C_rom, C)
+
+def test_mild_deformation_matches_own_geometry():
+    """Test queries near a trained factor against their own full solves."""
+    N, M = 30, 30
+    L = 0.01
+    rom = ReducedOrderModel(N, M, L, np.geomspace(0.01, 2.0, 6),
+                            deformation_factors=(0.0, 0.3))
+    
+    # 0.29 changes the tissue mask and must fall back; 0.3 and 0.31 share
+    # the trained mask and stay on the surrogate
+    for factor in [0.29, 0.3, 0.31]:
+        mask = create_tissue_mask(N, M, L, factor)
+        C = solve_stationary_diffusion(N, M, L, lambda_param=0.1, mask=mask)
+        C_rom, _ = rom.solve(0.1, deformation_factor=factor)
+        flux_rom, _ = rom.flux(0.1, deformation_factor=factor)
+        
+        np.testing.assert_allclose(C_rom, C, rtol=1e-6, atol=1e-8)
+        np.testing.assert_allclose(flux_rom, calculate_oxygen_flux(C, L / N, 0.1),
+                                   rtol=1e-6)
+    # Only the solve and flux queries at 0.29 used the full solver
+    assert rom.fallbacks == 2
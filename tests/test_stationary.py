@@ -64,4 +64,59 @@ def test_convergence():
     # Should be reasonably close (allowing for discretization error)
     coarse_interp = C_coarse[::3, ::3]  # Rough interpolation
     error = np.mean(np.abs(coarse_interp - C_fine[::3, ::3]))
-    assert error < 0.1  # Conservative tolerance
\ No newline at end of file
+    assert error < 0.1  # Conservative tolerance
+
+def test_uniform_diffusivity_matches_laplacian():
+    """Test that a uniform diffusivity field reproduces the Laplace solution."""
+    N, M = 30, 25
+    L = 0.01
+    C = solve_stationary_diffusion(N, M, L)
+    D = np.full((M, N), PhysicalConstants.D_O2)
+    C_D = solve_stationary_diffusion(N, M, L, D=D)
+    np.testing.assert_allclose(C_D, C, rtol=1e-10)
+
+def test_layered_diffusivity_flux_continuity():
+    """Test that the harmonic-mean stencil conserves flux across layers."""
+    N, M = 20, 41
+    L = 0.01
+    D = np.full((M, N), PhysicalConstants.D_O2)
+    D[M // 2:, :] = PhysicalConstants.D_O2 / 4
+    C = solve_stationary_diffusion(N, M, L, D=D)
+    
+    # Profile is piecewise linear, four times steeper in the low-D layer
+    column = C[:, N // 2]
+    slope_high = column[M // 2 - 2] - column[M // 2 - 3]
+    slope_low = column[M // 2 + 3] - column[M // 2 + 2]
+    np.testing.assert_allclose(slope_low, 4 * slope_high, rtol=1e-6)
+
+def test_masked_tissue():
+    """Test that cells outside the tissue mask stay at blood concentration."""
+    N, M = 30, 30
+    L = 0.01
+    C_b = PhysicalConstants.C_BLOOD
+    mask = np.ones((M, N), dtype=bool)
+    mask[10:20, 10:20] = False
+    C = solve_stationary_diffusion(N, M, L, mask=mask)
+    
+    np.testing.assert_allclose(C[~mask], C_b)
+    np.testing.assert_allclose(C[-1, :], PhysicalConstants.C_AIR, rtol=1e-10)
+    assert np.all(np.isfinite(C))
+
+def test_enclosed_tissue_island():
+    """Test that tissue cut off from both boundaries does not make A singular."""
+    N, M = 20, 20
+    L = 0.01
+    C_b = PhysicalConstants.C_BLOOD
+    mask = np.ones((M, N), dtype=bool)
+    mask[7:12, 7:12] = False
+    mask[8:11, 8:11] = True
+    C = solve_stationary_diffusion(N, M, L, mask=mask)
+    
+    assert np.all(np.isfinite(C))
+    np.testing.assert_allclose(C[8:11, 8:11], C_b)
+    
+    # Random irregular masks, as produced for COPD ensembles
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        mask = rng.random((M, N)) > 0.3
+        assert np.all(np.isfinite(solve_stationary_diffusion(N, M, L, mask=mask)))